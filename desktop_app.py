@@ -3,7 +3,7 @@ from PyQt5.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, 
     QLabel, QTableWidget, QTableWidgetItem, QFileDialog, QMessageBox, 
     QTextEdit, QGroupBox, QSizePolicy, QInputDialog, QDialog, QProgressBar,
-    QComboBox
+    QComboBox, QCheckBox
 )
 from PyQt5.QtGui import QFont
 from src.model import SprintSuccessModel
@@ -12,7 +12,8 @@ import os
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 from src.jira_client import JiraClient
-from src.data_processing import process_issues_to_df
+from src.data_processing import process_issues_to_df, CHANGELOG_COLUMNS
+from src.whatif import WhatIfSession
 from dotenv import load_dotenv
 from sklearn.model_selection import train_test_split
 
@@ -36,6 +37,8 @@ class MainWindow(QWidget):
         self.train_path = None  # Path to training data file
         self.predict_data = None  # Data we want to make predictions for
         self.predict_path = None  # Path to prediction data file
+        self.whatif = None  # What-if session for the predicted sprint
+        self.changelog_cache = {}  # Processed Jira issue histories, shared by all Jira fetches
         self.jira_configured = self.check_jira_config()  # Check if we can use Jira
 
         # Create the main layout
@@ -61,6 +64,16 @@ class MainWindow(QWidget):
         self.jira_controls_layout.addWidget(self.predict_jira_button)
         self.layout.addLayout(self.jira_controls_layout)
 
+        # Create buttons for what-if replanning of the predicted sprint
+        self.whatif_controls_layout = QHBoxLayout()
+        self.remove_issue_button = QPushButton('Remove Selected Issue')
+        self.remove_issue_button.clicked.connect(self.remove_selected_issue)
+        self.whatif_controls_layout.addWidget(self.remove_issue_button)
+        self.reassign_issue_button = QPushButton('Reassign Selected Issue')
+        self.reassign_issue_button.clicked.connect(self.reassign_selected_issue)
+        self.whatif_controls_layout.addWidget(self.reassign_issue_button)
+        self.layout.addLayout(self.whatif_controls_layout)
+
         # Add a progress bar for Jira operations
         self.progress_bar = QProgressBar()
         self.progress_bar.setVisible(False)
@@ -74,6 +87,9 @@ class MainWindow(QWidget):
         self.model_combo.currentTextChanged.connect(self.on_model_changed)
         model_layout.addWidget(model_label)
         model_layout.addWidget(self.model_combo)
+        self.text_checkbox = QCheckBox("Use issue summaries")
+        self.text_checkbox.stateChanged.connect(self.on_model_changed)
+        model_layout.addWidget(self.text_checkbox)
         model_layout.addStretch()
         self.layout.addLayout(model_layout)
         
@@ -136,7 +152,11 @@ class MainWindow(QWidget):
             "LightGBM": "lightgbm"
         }
         model_type = model_map[self.model_combo.currentText()]
-        self.model = SprintSuccessModel(model_type=model_type)
+        self.model = SprintSuccessModel(model_type=model_type, use_text=self.text_checkbox.isChecked())
+        self.whatif = None  # Sessions are tied to the model they were started with
+        # Predictions shown so far came from the old model
+        if hasattr(self, 'table'):
+            self.table.setRowCount(0)
         if hasattr(self, 'X') and hasattr(self, 'y'):
             self.train_model()  # Retrain with new model type
 
@@ -185,6 +205,13 @@ You can set these in a .env file or in your system environment variables."""
                 "issue_type", "assignee", "original_estimate", "was_in_previous_sprint",
                 "days_in_sprint", "comment_count", "tasks_per_assignee", "sprint_success"
             ]
+            # Issue history features are only there for data fetched with changelogs
+            model_columns += [col for col in CHANGELOG_COLUMNS if col in df.columns]
+            if self.model.use_text:
+                if 'key' not in df.columns or 'summary' not in df.columns:
+                    self.show_selectable_dialog('Error', 'Training CSV must contain "key" and "summary" columns to use issue summaries.')
+                    return
+                model_columns += ['key', 'summary']
             df = df[model_columns]
             
             # Split data into training and testing sets
@@ -195,6 +222,11 @@ You can set these in a .env file or in your system environment variables."""
             # Create and train the model
             self.model.train(X_train, y_train)
             
+            # Calibrate probabilities and tune the decision threshold,
+            # holding out whole sprints when we know which sprint each issue was in
+            groups = self.train_data.loc[X_train.index, 'sprint_id'] if 'sprint_id' in self.train_data.columns else None
+            self.model.calibrate(X_train, y_train, groups=groups)
+            
             # Show how well the model performs
             self.show_accuracy(X_test, y_test)
             self.show_selectable_dialog('Model Trained', 'Model training complete!')
@@ -222,7 +254,60 @@ You can set these in a .env file or in your system environment variables."""
             df = self.predict_data.copy()
             X = df.drop(columns=['sprint_success'], errors='ignore')
             predictions = self.model.predict(X)
+            self.whatif = None  # Started on the first what-if edit
             self.show_predictions(df, predictions)
+
+    def get_whatif_session(self):
+        """Get the what-if session for the predicted sprint, starting one if needed"""
+        if self.predict_data is None:
+            self.show_selectable_dialog('Error', 'Make predictions first!')
+            return None
+        if self.model is None or not self.model.is_trained():
+            self.show_selectable_dialog('Error', 'Train the model first!')
+            return None
+        if self.whatif is None:
+            try:
+                self.whatif = WhatIfSession(self.model, self.predict_data)
+            except Exception as e:
+                self.show_selectable_dialog('Error', f'Failed to start what-if session: {e}')
+                return None
+        return self.whatif
+
+    def get_selected_key(self):
+        """Get the issue key of the selected table row"""
+        row = self.table.currentRow()
+        if row < 0 or self.table.item(row, 1) is None:
+            self.show_selectable_dialog('Error', 'Select an issue in the table first.')
+            return None
+        return self.table.item(row, 1).text()
+
+    def remove_selected_issue(self):
+        """Take the selected issue out of the sprint and update the predictions"""
+        session = self.get_whatif_session()
+        key = self.get_selected_key() if session is not None else None
+        if key is None:
+            return
+        try:
+            session.remove_issue(key)
+            self.show_predictions(session.df, session.predict())
+        except Exception as e:
+            self.show_selectable_dialog('Error', f'Failed to remove issue: {e}')
+
+    def reassign_selected_issue(self):
+        """Give the selected issue to another assignee and update the predictions"""
+        session = self.get_whatif_session()
+        key = self.get_selected_key() if session is not None else None
+        if key is None:
+            return
+        assignees = sorted(session.df['assignee'].astype(str).unique())
+        assignee, ok = QInputDialog.getItem(self, 'Reassign Issue', f'Choose a new assignee for {key}:', assignees, 0, True)
+        if not ok:
+            return
+        try:
+            session.reassign_issue(key, assignee)
+            self.show_predictions(session.df, session.predict())
+        except Exception as e:
+            self.show_selectable_dialog('Error', f'Failed to reassign issue: {e}')
     
     def show_predictions(self, df, predictions):
         """Show the predictions in a table"""
@@ -320,7 +405,7 @@ You can set these in a .env file or in your system environment variables."""
             self.progress_bar.setValue(0)
             self.progress_bar.setVisible(True)
             QApplication.processEvents()
-            client = JiraClient()
+            client = JiraClient(changelog_cache=self.changelog_cache)
             boards = client.get_boards()
             if not boards:
                 self.progress_bar.setVisible(False)
@@ -336,18 +421,22 @@ You can set these in a .env file or in your system environment variables."""
             sprints = client.get_sprints(board_id=selected_board_id, count=100)
             closed_sprints = [s for s in sprints if s.get('state') == 'closed']
             all_parsed_issues = []
+            all_changelog_rows = []
             total_sprints = len(closed_sprints)
             
             for idx, sprint in enumerate(closed_sprints):
                 self.progress_bar.setValue(int((idx + 1) / total_sprints * 100))
                 sprint_id = sprint['id']
                 sprint_end = pd.to_datetime(sprint.get('endDate')) if sprint.get('endDate') else None
-                issues = client.get_issues_for_sprint(sprint_id)
+                sprint_start = pd.to_datetime(sprint.get('startDate')) if sprint.get('startDate') else None
+                issues = client.get_issues_for_sprint(sprint_id, expand_changelog=True)
                 for issue in issues:
-                    parsed = client.parse_issue(issue, sprint_end)
+                    parsed = client.parse_issue(issue, sprint_end, sprint_start)
                     parsed['sprint_id'] = sprint_id
+                    parsed['board_id'] = selected_board_id
                     all_parsed_issues.append(parsed)
-            df = process_issues_to_df(all_parsed_issues)
+                    all_changelog_rows.extend(client.parse_changelog(issue))
+            df = process_issues_to_df(all_parsed_issues, all_changelog_rows)
             self.progress_bar.setValue(100)
             self.progress_bar.setVisible(False)
             if df.empty:
@@ -380,7 +469,7 @@ You can set these in a .env file or in your system environment variables."""
             self.progress_bar.setValue(0)
             self.progress_bar.setVisible(True)
             QApplication.processEvents()
-            client = JiraClient()
+            client = JiraClient(changelog_cache=self.changelog_cache)
             boards = client.get_boards()
             if not boards:
                 self.progress_bar.setVisible(False)
@@ -405,18 +494,23 @@ You can set these in a .env file or in your system environment variables."""
                 self.progress_bar.setVisible(False)
                 return
             selected_sprint_id = sprint_ids[sprint_names.index(sprint_idx)]
-            issues = client.get_issues_for_sprint(selected_sprint_id)
+            issues = client.get_issues_for_sprint(selected_sprint_id, expand_changelog=True)
             sprint_end = None
+            sprint_start = None
             for s in open_sprints:
                 if s['id'] == selected_sprint_id:
                     sprint_end = pd.to_datetime(s.get('endDate')) if s.get('endDate') else None
+                    sprint_start = pd.to_datetime(s.get('startDate')) if s.get('startDate') else None
                     break
             parsed_issues = []
+            changelog_rows = []
             for issue in issues:
-                parsed = client.parse_issue(issue, sprint_end)
+                parsed = client.parse_issue(issue, sprint_end, sprint_start)
                 parsed['sprint_id'] = selected_sprint_id
+                parsed['board_id'] = selected_board_id
                 parsed_issues.append(parsed)
-            df = process_issues_to_df(parsed_issues)
+                changelog_rows.extend(client.parse_changelog(issue))
+            df = process_issues_to_df(parsed_issues, changelog_rows)
             self.progress_bar.setValue(100)
             self.progress_bar.setVisible(False)
             if df.empty:
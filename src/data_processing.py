@@ -1,9 +1,89 @@
+import numpy as np
 import pandas as pd
 
-def process_issues_to_df(parsed_issues):
+# Features built from issue history, only present when changelogs were fetched
+CHANGELOG_COLUMNS = [
+    "status_change_count", "days_in_progress", "reassignment_count",
+    "estimate_change_count", "carry_over_count"
+]
+
+# Statuses that mean nobody is working on the issue yet, or it is finished
+NOT_IN_PROGRESS_STATUSES = ["to do", "open", "backlog", "selected for development", "done", "closed", "resolved"]
+
+def build_changelog_features(changelog_rows, issues):
+    """
+    Turn flattened changelog rows into per-issue features for each sprint the issue was in.
+    Only history from before the sprint started is used, since that is what we know
+    when planning the sprint.
+    Args:
+        changelog_rows (list): Rows from JiraClient.parse_changelog
+        issues (DataFrame): Must contain key, sprint_id, sprint_start and sprint_end
+    Returns:
+        DataFrame with key, sprint_id and the CHANGELOG_COLUMNS
+    """
+    targets = issues[["key", "sprint_id"]].drop_duplicates().reset_index(drop=True)
+    features = targets.copy()
+    for col in CHANGELOG_COLUMNS:
+        features[col] = 0.0
+    if not changelog_rows:
+        return features
+
+    # An issue in several sprints brings its history along several times
+    events = pd.DataFrame(changelog_rows).drop_duplicates(subset=["key", "history_id", "field"])
+    events["changed"] = pd.to_datetime(events["changed"], utc=True)
+
+    # Cut each issue's history off where its sprint started. Without a start date,
+    # a sprint that hasn't ended yet is cut off now; a finished one gets no history,
+    # because anything up to its end could give away the outcome.
+    cutoffs = issues[["key", "sprint_id", "sprint_start", "sprint_end"]].drop_duplicates(subset=["key", "sprint_id"])
+    now = pd.Timestamp.now(tz="UTC")
+    start = pd.to_datetime(cutoffs["sprint_start"], utc=True)
+    end = pd.to_datetime(cutoffs["sprint_end"], utc=True)
+    not_finished = end.isna() | (end > now)
+    cutoffs = cutoffs.assign(cutoff=start.where(start.notna(), pd.Series(now, index=cutoffs.index).where(not_finished)))
+    events = events.merge(cutoffs[["key", "sprint_id", "cutoff"]], on="key")
+    events = events[events["changed"] < events["cutoff"]]
+    group = ["key", "sprint_id"]
+
+    # 1. How often did the status, assignee and estimate change?
+    field_counts = {
+        "status_change_count": events["field"] == "status",
+        "reassignment_count": events["field"] == "assignee",
+        "estimate_change_count": events["field"].isin(["timeoriginalestimate", "timeestimate"]),
+    }
+    counts = pd.DataFrame({name: mask.astype(int) for name, mask in field_counts.items()})
+    counts[group] = events[group]
+    counts = counts.groupby(group).sum()
+
+    # 2. How long was the issue being worked on?
+    status = events[events["field"] == "status"].sort_values(group + ["changed"])
+    next_change = status.groupby(group)["changed"].shift(-1).fillna(status["cutoff"])
+    in_progress = ~status["to_string"].fillna("").str.lower().isin(NOT_IN_PROGRESS_STATUSES)
+    status = status.assign(days=np.where(in_progress, (next_change - status["changed"]).dt.total_seconds() / 86400, 0.0))
+    days = status.groupby(group)["days"].sum().rename("days_in_progress")
+
+    # 3. How many earlier sprints was the issue carried over from?
+    sprints = events[events["field"] == "Sprint"]
+    sprint_ids = pd.concat([
+        sprints[group + ["from"]].rename(columns={"from": "other"}),
+        sprints[group + ["to"]].rename(columns={"to": "other"}),
+    ])
+    sprint_ids["other"] = sprint_ids["other"].fillna("").astype(str).str.split(",")
+    sprint_ids = sprint_ids.explode("other")
+    sprint_ids["other"] = sprint_ids["other"].str.strip()
+    sprint_ids = sprint_ids[(sprint_ids["other"] != "") & (sprint_ids["other"] != sprint_ids["sprint_id"].astype(str))]
+    carry = sprint_ids.groupby(group)["other"].nunique().rename("carry_over_count")
+
+    features = features.set_index(group)
+    for values in [counts, days, carry]:
+        features.update(values)
+    return features.reset_index()
+
+def process_issues_to_df(parsed_issues, changelog_rows=None):
     """
     Convert a list of Jira issues into a format suitable for the machine learning model.
     Adds useful features like whether a task was in a previous sprint.
+    If changelog rows are given, history features like reassignments are added too.
     """
     # Convert list of issues to a DataFrame
     df = pd.DataFrame(parsed_issues)
@@ -23,6 +103,14 @@ def process_issues_to_df(parsed_issues):
     # 4. How many tasks per person?
     df["tasks_per_assignee"] = df["total_tasks_in_sprint"] / df["unique_assignees_in_sprint"]
     
+    # 5. What happened to the task before the sprint? (needs the changelog)
+    if changelog_rows is not None:
+        for col in ["sprint_start", "sprint_end"]:
+            if col not in df.columns:
+                df[col] = None
+        df = df.merge(build_changelog_features(changelog_rows, df), on=["key", "sprint_id"], how="left")
+        df["was_in_previous_sprint"] = ((df["was_in_previous_sprint"] == 1) | (df["carry_over_count"] > 0)).astype(int)
+    
     # Handle missing data
     if 'original_estimate' in df.columns:
         df['original_estimate'] = df['original_estimate'].fillna(0)
@@ -36,10 +124,16 @@ def process_issues_to_df(parsed_issues):
     ]
     
     # Define which columns to show in the results
-    display_columns = ["key", "summary"]
+    # (sprint_id is kept so sprints can be held out together when calibrating)
+    display_columns = ["key", "summary", "sprint_id"]
     
     # Combine all needed columns
     all_columns = model_columns + display_columns
+    # Keep the board so per-team models can be trained on the data
+    if "board_id" in df.columns:
+        all_columns.append("board_id")
+    if changelog_rows is not None:
+        all_columns += CHANGELOG_COLUMNS
     
     # Clean the data: keep only needed columns and remove rows with missing data
     df_clean = df[all_columns].copy()
@@ -0,0 +1,181 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import joblib
+from src.model import SprintSuccessModel
+
+
+# Holdout folds used when calibrating a team model
+CALIBRATION_FOLDS = 5
+
+def _train_team_model(model_type, use_text, calibrate, X, y, groups=None):
+    """Train one team's model. Runs in a worker process, so it must live at module level."""
+    model = SprintSuccessModel(model_type=model_type, use_text=use_text)
+    model.train(X, y)
+    # Calibrating needs every holdout fold to see both outcomes; otherwise keep raw probabilities
+    if calibrate and np.unique(y, return_counts=True)[1].min() >= CALIBRATION_FOLDS:
+        model.calibrate(X, y, groups=groups, n_splits=CALIBRATION_FOLDS)
+    return model
+
+
+class TeamEnsembleModel:
+    """
+    One SprintSuccessModel per team (board), with a global model for teams that
+    have too little history of their own.
+
+    Team models are trained in parallel worker processes. When scoring, each issue
+    is routed to its team's model and the results are put back in the original order.
+    Saved ensembles keep one compressed file per team. Team models are read only when
+    one of their issues is scored, and only the most recently used ones stay loaded.
+    """
+    def __init__(self, model_type='random_forest', team_column='board_id', min_team_size=50,
+                 use_text=False, calibrate=False, n_jobs=None, max_loaded_models=32,
+                 group_column='sprint_id'):
+        """
+        Initialize the ensemble.
+        Args:
+            model_type (str): Model type used for every team, see SprintSuccessModel
+            team_column (str): Column that says which team an issue belongs to
+            min_team_size (int): Teams with fewer training issues use the global model
+            use_text (bool): Also learn from the issue summary
+            calibrate (bool): Calibrate each model after training
+            n_jobs (int): Number of worker processes (default: number of CPUs)
+            max_loaded_models (int): How many team models read from disk are kept in memory
+            group_column (str): Column used to hold out whole sprints when calibrating;
+                it is not used as a feature
+        """
+        self.model_type = model_type
+        self.team_column = team_column
+        self.min_team_size = min_team_size
+        self.use_text = use_text
+        self.calibrate = calibrate
+        self.n_jobs = n_jobs
+        self.max_loaded_models = max_loaded_models
+        self.group_column = group_column
+
+        self.global_model = None
+        self.team_models = {}  # team id -> SprintSuccessModel, for models trained in this process
+        self.team_paths = {}  # team id -> file, for models of a loaded ensemble
+        self._loaded = OrderedDict()  # team id -> SprintSuccessModel read from disk, least recently used first
+
+    def _team_ids(self, X):
+        """Team id of each row, as strings so ids from CSV and Jira match"""
+        if self.team_column not in X.columns:
+            raise ValueError(f"Data must contain a '{self.team_column}' column to route issues to team models.")
+        return X[self.team_column].astype(str).to_numpy()
+
+    def _features(self, X):
+        """The columns the models learn from: everything but the team and sprint ids"""
+        return X.drop(columns=[self.team_column, self.group_column], errors="ignore")
+
+    def train(self, X, y):
+        """Train the global model and one model for every team with enough history."""
+        teams = self._team_ids(X)
+        features = self._features(X)
+        y = pd.Series(np.asarray(y), index=features.index)
+        groups = X[self.group_column].to_numpy() if self.group_column in X.columns else None
+
+        # Only teams with enough issues, and both outcomes, get their own model
+        jobs = {}
+        for team, idx in pd.Series(np.arange(len(teams))).groupby(teams).groups.items():
+            team_y = y.iloc[idx]
+            if len(idx) >= self.min_team_size and team_y.nunique() > 1:
+                jobs[team] = (features.iloc[idx], team_y, groups[idx] if groups is not None else None)
+
+        self.team_models = {}
+        self.team_paths = {}
+        self._loaded = OrderedDict()
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as pool:
+            global_future = pool.submit(_train_team_model, self.model_type, self.use_text, self.calibrate, features, y, groups)
+            futures = {
+                team: pool.submit(_train_team_model, self.model_type, self.use_text, self.calibrate, team_X, team_y, team_groups)
+                for team, (team_X, team_y, team_groups) in jobs.items()
+            }
+            self.global_model = global_future.result()
+            for team, future in futures.items():
+                self.team_models[team] = future.result()
+
+    def _model_for(self, team):
+        """Get a team's model, loading it from disk the first time; fall back to the global model"""
+        if team in self.team_models:
+            return self.team_models[team]
+        if team in self._loaded:
+            self._loaded.move_to_end(team)
+            return self._loaded[team]
+        if team in self.team_paths:
+            model = SprintSuccessModel(model_type=self.model_type, use_text=self.use_text)
+            model.load(self.team_paths[team])
+            self._loaded[team] = model
+            # Drop the least recently used models so memory stays bounded
+            while len(self._loaded) > self.max_loaded_models:
+                self._loaded.popitem(last=False)
+            return model
+        return self.global_model
+
+    def _route(self, X, score, empty):
+        """
+        Score every team's rows with its own model and put the results back in order.
+        Returns empty when there are no rows to score.
+        """
+        codes, teams = pd.factorize(self._team_ids(X))
+        features = self._features(X)
+        order = np.argsort(codes, kind="stable")
+        bounds = np.searchsorted(codes[order], np.arange(len(teams) + 1))
+        results = None
+        for code, team in enumerate(teams):
+            idx = order[bounds[code]:bounds[code + 1]]
+            values = score(self._model_for(team), features.iloc[idx])
+            if results is None:
+                results = np.empty((len(X),) + values.shape[1:], dtype=values.dtype)
+            results[idx] = values
+        return results if results is not None else empty
+
+    def predict(self, X):
+        """Make predictions, each issue scored by its team's model."""
+        classes = self.global_model.model.classes_
+        return self._route(X, lambda model, rows: model.predict(rows), np.empty(0, dtype=classes.dtype))
+
+    def predict_proba(self, X):
+        """Get probability estimates, each issue scored by its team's model."""
+        classes = self.global_model.model.classes_
+        return self._route(X, lambda model, rows: model.predict_proba(rows), np.empty((0, len(classes))))
+
+    def save(self, directory, compress=3):
+        """Save the ensemble to a directory, one compressed file per model."""
+        os.makedirs(directory, exist_ok=True)
+        self.global_model.save(os.path.join(directory, "global.joblib"), compress=compress)
+        files = {}
+        for i, team in enumerate(sorted(set(self.team_models) | set(self.team_paths))):
+            filename = f"team_{i}.joblib"
+            self._model_for(team).save(os.path.join(directory, filename), compress=compress)
+            files[team] = filename
+        joblib.dump({
+            "model_type": self.model_type,
+            "team_column": self.team_column,
+            "group_column": self.group_column,
+            "min_team_size": self.min_team_size,
+            "use_text": self.use_text,
+            "calibrate": self.calibrate,
+            "teams": files,
+        }, os.path.join(directory, "ensemble.joblib"))
+
+    def load(self, directory):
+        """
+        Load an ensemble from a directory.
+        Team models are only read when an issue of that team is scored.
+        """
+        manifest = joblib.load(os.path.join(directory, "ensemble.joblib"))
+        self.model_type = manifest["model_type"]
+        self.team_column = manifest["team_column"]
+        self.group_column = manifest.get("group_column", "sprint_id")
+        self.min_team_size = manifest["min_team_size"]
+        self.use_text = manifest["use_text"]
+        self.calibrate = manifest["calibrate"]
+
+        self.global_model = SprintSuccessModel(model_type=self.model_type, use_text=self.use_text)
+        self.global_model.load(os.path.join(directory, "global.joblib"))
+        self.team_models = {}
+        self._loaded = OrderedDict()
+        self.team_paths = {team: os.path.join(directory, filename) for team, filename in manifest["teams"].items()}
@@ -11,7 +11,8 @@ class JiraClient:
     A class that helps us talk to Jira and get sprint data.
     It handles things like logging in and getting information about tasks.
     """
-    def __init__(self, domain=None, email=None, api_token=None, project_key=None, board_id=None):
+    def __init__(self, domain=None, email=None, api_token=None, project_key=None, board_id=None,
+                 changelog_cache=None):
         # Get login information from environment variables or parameters
         self.domain = domain or os.getenv("JIRA_DOMAIN")
         self.email = email or os.getenv("JIRA_EMAIL")
@@ -23,6 +24,10 @@ class JiraClient:
         self.auth = HTTPBasicAuth(self.email, self.api_token)
         self.headers = {"Accept": "application/json"}
         
+        # Flattened changelogs we already processed, keyed by issue key and last update time.
+        # Pass in a shared dict to keep them across clients.
+        self.changelog_cache = changelog_cache if changelog_cache is not None else {}
+        
         # Make sure we don't send too many requests too quickly
         self.last_request_time = 0
         self.min_request_interval = 0.5  # wait 0.5 seconds between requests
@@ -120,12 +125,76 @@ class JiraClient:
         
         return data.get("values", [])
 
-    def get_issues_for_sprint(self, sprint_id: str) -> List[Dict[str, Any]]:
-        """Get all tasks in a sprint"""
+    def get_issues_for_sprint(self, sprint_id: str, expand_changelog: bool = False) -> List[Dict[str, Any]]:
+        """
+        Get all tasks in a sprint.
+        With expand_changelog the issue history comes along in the same request;
+        only histories that Jira cut short are fetched separately.
+        """
         url = f"https://{self.domain}/rest/agile/1.0/sprint/{sprint_id}/issue"
+        params = {"maxResults": 100}
+        if expand_changelog:
+            params["expand"] = "changelog"
+        
+        data = self._make_request('GET', url, params=params)
+        issues = data.get("issues", [])
+        if expand_changelog:
+            for issue in issues:
+                changelog = issue.get("changelog") or {}
+                histories = changelog.get("histories", [])
+                if self._changelog_cache_key(issue) in self.changelog_cache:
+                    continue
+                if changelog.get("total", len(histories)) > len(histories):
+                    issue["changelog"] = {"histories": self.get_changelog(issue["key"])}
+        return issues
+
+    def get_changelog(self, issue_key: str) -> List[Dict[str, Any]]:
+        """Get the full change history of one issue"""
+        url = f"https://{self.domain}/rest/api/3/issue/{issue_key}/changelog"
+        histories = []
+        start_at = 0
+        
+        # Jira gives us data in pages, so we need to get all pages
+        while True:
+            data = self._make_request('GET', url, params={
+                "maxResults": 100,
+                "startAt": start_at
+            })
+            
+            histories.extend(data.get("values", []))
+            if data.get("isLast", True) or len(data.get("values", [])) == 0:
+                break
+            start_at += len(data.get("values", []))
+        return histories
+
+    def _changelog_cache_key(self, issue: Dict[str, Any]):
+        """An issue's history only changes when the issue is updated"""
+        return (issue.get("key"), issue.get("fields", {}).get("updated"))
+
+    def parse_changelog(self, issue: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Flatten an issue's change history into one row per changed field.
+        The result is cached, so an issue that shows up in several sprints is processed once.
+        """
+        cache_key = self._changelog_cache_key(issue)
+        if cache_key in self.changelog_cache:
+            return self.changelog_cache[cache_key]
         
-        data = self._make_request('GET', url, params={"maxResults": 100})
-        return data.get("issues", [])
+        rows = []
+        for history in (issue.get("changelog") or {}).get("histories", []):
+            for item in history.get("items", []):
+                rows.append({
+                    "key": issue["key"],
+                    "history_id": history.get("id"),
+                    "changed": history.get("created"),
+                    "field": item.get("field"),
+                    "from": item.get("from"),
+                    "to": item.get("to"),
+                    "from_string": item.get("fromString"),
+                    "to_string": item.get("toString")
+                })
+        self.changelog_cache[cache_key] = rows
+        return rows
 
     def hash_display_name(self, name):
         if name is None:
@@ -133,7 +202,8 @@ class JiraClient:
         # Truncate SHA-256 to first 12 hex digits
         return hashlib.sha256(name.encode('utf-8')).hexdigest()[:12]
 
-    def parse_issue(self, issue: Dict[str, Any], sprint_end: Optional[pd.Timestamp]) -> Dict[str, Any]:
+    def parse_issue(self, issue: Dict[str, Any], sprint_end: Optional[pd.Timestamp],
+                    sprint_start: Optional[pd.Timestamp] = None) -> Dict[str, Any]:
         """
         Convert a Jira task into a format our machine learning model can use.
         Gets information like when it was created, when it was finished, and its status.
@@ -163,7 +233,9 @@ class JiraClient:
                 "resolved": resolutiondate,
                 "time_spent": time_spent if time_spent else None,
                 "sprint_success": int(is_closed and (resolutiondate is None or resolutiondate <= sprint_end)),
-                "days_in_sprint": (sprint_end - created).days if sprint_end and created else None
+                "days_in_sprint": (sprint_end - created).days if sprint_end and created else None,
+                "sprint_start": sprint_start,
+                "sprint_end": sprint_end
             }
         except (KeyError, TypeError) as e:
             raise ValueError(f"Invalid issue data format: {str(e)}")
@@ -5,25 +5,106 @@ from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.metrics import classification_report, confusion_matrix
+from sklearn.metrics import (
+    classification_report, confusion_matrix, f1_score, accuracy_score,
+    balanced_accuracy_score, precision_score, recall_score
+)
+from sklearn.model_selection import GroupKFold, StratifiedKFold
+from sklearn.isotonic import IsotonicRegression
+from sklearn.linear_model import LogisticRegression
+from sklearn.base import clone, BaseEstimator, TransformerMixin
+from sklearn.exceptions import NotFittedError
+from sklearn.utils.validation import check_is_fitted
+from sklearn.feature_extraction.text import HashingVectorizer
+from scipy import sparse
 import joblib
+import hashlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import xgboost as xgb
 from sklearn.neural_network import MLPClassifier
 import lightgbm as lgb
 
+# Metrics the decision threshold can be tuned for
+THRESHOLD_METRICS = {
+    "f1": lambda y, y_pred: f1_score(y, y_pred, zero_division=0),
+    "accuracy": accuracy_score,
+    "balanced_accuracy": balanced_accuracy_score,
+    "precision": lambda y, y_pred: precision_score(y, y_pred, zero_division=0),
+    "recall": lambda y, y_pred: recall_score(y, y_pred, zero_division=0),
+}
+
+# Summary vectors shared by all models, keyed by (n_features, issue key, digest of the summary)
+_SUMMARY_CACHE = {}
+MAX_SUMMARY_CACHE_SIZE = 100000
+
+class SummaryVectorizer(BaseEstimator, TransformerMixin):
+    """
+    Turns issue summaries into a fixed number of hashed word features.
+    Expects the columns ['key', 'summary']. Vectors are cached by issue key and a
+    hash of the summary, so unchanged issues are not tokenized again on the next run.
+    """
+    def __init__(self, n_features=256):
+        self.n_features = n_features
+
+    def _vectorizer(self):
+        return HashingVectorizer(n_features=self.n_features, ngram_range=(1, 2),
+                                 alternate_sign=False, norm="l2")
+
+    def fit(self, X, y=None):
+        """Nothing to learn, hashing needs no vocabulary"""
+        return self
+
+    def transform(self, X):
+        """Get a sparse matrix with one row of summary features per issue"""
+        keys = X["key"].astype(str).to_numpy()
+        summaries = X["summary"].fillna("").astype(str).to_numpy()
+        # A short digest keeps the cache keys small however long the summaries are
+        cache_keys = [
+            (self.n_features, k, hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest())
+            for k, text in zip(keys, summaries)
+        ]
+
+        # Tokenize only the summaries we have not seen before, in one batch
+        missing = {}
+        for ck, text in zip(cache_keys, summaries):
+            if ck not in _SUMMARY_CACHE:
+                missing.setdefault(ck, text)
+        if missing:
+            if len(_SUMMARY_CACHE) + len(missing) > MAX_SUMMARY_CACHE_SIZE:
+                _SUMMARY_CACHE.clear()
+            vectors = self._vectorizer().transform(list(missing.values()))
+            for i, ck in enumerate(missing):
+                start, end = vectors.indptr[i], vectors.indptr[i + 1]
+                _SUMMARY_CACHE[ck] = (vectors.indices[start:end], vectors.data[start:end])
+
+        # Build the sparse matrix straight from the cached rows
+        rows = [_SUMMARY_CACHE[ck] for ck in cache_keys]
+        indptr = np.concatenate([[0], np.cumsum([len(idx) for idx, _ in rows])])
+        indices = np.concatenate([idx for idx, _ in rows]) if rows else np.array([], dtype=np.int32)
+        data = np.concatenate([values for _, values in rows]) if rows else np.array([])
+        return sparse.csr_matrix((data, indices, indptr), shape=(len(rows), self.n_features))
+
+    def get_feature_names_out(self, input_features=None):
+        return np.array([f"summary_{i}" for i in range(self.n_features)], dtype=object)
+
 class SprintSuccessModel:
     """
     A machine learning model that predicts whether a task will be completed in a sprint.
     """
-    def __init__(self, model_type='random_forest'):
+    def __init__(self, model_type='random_forest', use_text=False, text_features=256):
         """
         Initialize the model with specified type.
         Args:
             model_type (str): Either 'random_forest', 'xgboost', 'mlp', or 'lightgbm'
+            use_text (bool): Also learn from the issue summary (needs 'key' and 'summary' columns)
+            text_features (int): Number of hashed features used for the summary
         """
         self.model_type = model_type
+        self.use_text = use_text
+        
+        # Probability calibration and decision threshold, set by calibrate()
+        self.calibration = None
         
         # Define which columns contain text data (like task type and assignee)
         self.categorical = ["issue_type", "assignee"]
@@ -60,13 +141,21 @@ class SprintSuccessModel:
             raise ValueError("model_type must be either 'random_forest', 'xgboost', 'mlp', or 'lightgbm'")
         
         # Create a pipeline that:
-        # 1. Converts text data to numbers (OneHotEncoder)
+        # 1. Converts text data to numbers (OneHotEncoder, and SummaryVectorizer if enabled)
         # 2. Scales numerical data (StandardScaler)
         # 3. Makes predictions (RandomForestClassifier, XGBoost, MLP, or LightGBM)
-        self.model = Pipeline([
-            ("preprocess", ColumnTransformer([
+        if use_text:
+            # Keep everything sparse, the summary features are mostly zeros
+            preprocess = ColumnTransformer([
+                ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=True), self.categorical),
+                ("text", SummaryVectorizer(n_features=text_features), ["key", "summary"])
+            ], remainder='passthrough', sparse_threshold=1.0)
+        else:
+            preprocess = ColumnTransformer([
                 ("cat", OneHotEncoder(handle_unknown="ignore", sparse_output=False), self.categorical)
-            ], remainder='passthrough')),
+            ], remainder='passthrough')
+        self.model = Pipeline([
+            ("preprocess", preprocess),
             ("scaler", StandardScaler(with_mean=False)),  # Don't center sparse matrices
             ("classifier", base_classifier)
         ])
@@ -74,14 +163,114 @@ class SprintSuccessModel:
     def train(self, X, y):
         """Train the model on the provided data."""
         self.model.fit(X, y)
+        # An old calibration does not belong to the newly trained model
+        self.calibration = None
         
+    def is_trained(self):
+        """Check whether the model has been trained (or loaded) yet."""
+        try:
+            check_is_fitted(self.model)
+            return True
+        except NotFittedError:
+            return False
+
     def predict(self, X):
         """Make predictions using the trained model."""
-        return self.model.predict(X)
+        return self.proba_to_labels(self.predict_proba(X))
     
     def predict_proba(self, X):
         """Get probability estimates for each class."""
-        return self.model.predict_proba(X)
+        return self.apply_calibration(self.model.predict_proba(X))
+
+    def calibrate(self, X, y, groups=None, method="isotonic", metric="f1", n_splits=5):
+        """
+        Fit a probability calibration and pick the decision threshold.
+        Out-of-fold probabilities are collected by training copies of the pipeline
+        on folds of the data. When groups (e.g. sprint ids) are given, whole
+        sprints are held out together so the calibration is not fit on leaked data.
+        Args:
+            X, y: The training data
+            groups: Optional group label for each row, usually sprint_id
+            method (str): Either 'isotonic' or 'platt'
+            metric (str): Metric the decision threshold is chosen for, see THRESHOLD_METRICS
+            n_splits (int): Number of holdout folds
+        Returns:
+            The calibration, or None if there is too little data to fit one
+            (the model then keeps using its raw probabilities)
+        """
+        if method not in ("isotonic", "platt"):
+            raise ValueError("method must be either 'isotonic' or 'platt'")
+        if metric not in THRESHOLD_METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(THRESHOLD_METRICS)}")
+
+        self.calibration = None
+        y = np.asarray(y)
+        classes = self.model.classes_
+        if len(classes) < 2:
+            return None
+        if groups is not None and len(np.unique(groups)) >= 2:
+            folds = GroupKFold(n_splits=min(n_splits, len(np.unique(groups)))).split(X, y, groups)
+        else:
+            # Too few sprints to hold out whole ones, so just keep the outcomes balanced
+            n_splits = min(n_splits, int(np.min(np.unique(y, return_counts=True)[1])))
+            if n_splits < 2:
+                return None
+            folds = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y)
+
+        # Probability of the positive class for every row, from a model that did not see it
+        scores = np.zeros(len(y))
+        scored = np.zeros(len(y), dtype=bool)
+        for train_idx, test_idx in folds:
+            # A fold that only saw one outcome can't give probabilities for both
+            if len(np.unique(y[train_idx])) < 2:
+                continue
+            fold_model = clone(self.model)
+            fold_model.fit(X.iloc[train_idx], y[train_idx])
+            scores[test_idx] = fold_model.predict_proba(X.iloc[test_idx])[:, 1]
+            scored[test_idx] = True
+
+        scores, y = scores[scored], y[scored]
+        if len(np.unique(y)) < 2:
+            return None
+
+        positive = (y == classes[1]).astype(int)
+        if method == "isotonic":
+            iso = IsotonicRegression(out_of_bounds="clip", y_min=0.0, y_max=1.0).fit(scores, positive)
+            calibration = {"method": method, "x": iso.X_thresholds_, "y": iso.y_thresholds_}
+        else:
+            lr = LogisticRegression(C=1e6).fit(scores.reshape(-1, 1), positive)
+            calibration = {"method": method, "a": float(lr.coef_[0, 0]), "b": float(lr.intercept_[0])}
+
+        # Try thresholds on the calibrated out-of-fold probabilities and keep the best one
+        calibrated = self._calibrate_scores(scores, calibration)
+        candidates = np.unique(np.concatenate([[0.5], np.quantile(calibrated, np.linspace(0, 1, 101))]))
+        score_fn = THRESHOLD_METRICS[metric]
+        results = [score_fn(positive, (calibrated >= t).astype(int)) for t in candidates]
+        best = int(np.argmax(results))
+        calibration.update({"metric": metric, "threshold": float(candidates[best]), "score": float(results[best])})
+        self.calibration = calibration
+        return calibration
+
+    @staticmethod
+    def _calibrate_scores(scores, calibration):
+        """Map raw positive-class scores to calibrated probabilities"""
+        if calibration["method"] == "isotonic":
+            return np.interp(scores, calibration["x"], calibration["y"])
+        return 1.0 / (1.0 + np.exp(-(calibration["a"] * scores + calibration["b"])))
+
+    def apply_calibration(self, proba):
+        """Calibrate a matrix of raw class probabilities (no-op if not calibrated)."""
+        if self.calibration is None:
+            return proba
+        positive = self._calibrate_scores(proba[:, 1], self.calibration)
+        return np.column_stack([1.0 - positive, positive])
+
+    def proba_to_labels(self, proba):
+        """Turn class probabilities into labels using the tuned decision threshold."""
+        classes = self.model.classes_
+        if self.calibration is None:
+            return classes[np.argmax(proba, axis=1)]
+        return np.where(proba[:, 1] >= self.calibration["threshold"], classes[1], classes[0])
     
     def get_feature_importance(self):
         """Get feature importance scores."""
@@ -119,7 +308,7 @@ class SprintSuccessModel:
     def evaluate(self, X, y):
         """Show how well the model performs"""
         # Get predictions
-        y_pred = self.model.predict(X)
+        y_pred = self.predict(X)
         
         # Print detailed performance metrics
         report = classification_report(y, y_pred, zero_division=0)
@@ -128,10 +317,22 @@ class SprintSuccessModel:
         # Create a confusion matrix visualization
         self.plot_confusion_matrix(y, y_pred)
 
-    def save(self, path):
-        """Save the trained model to a file"""
-        joblib.dump(self.model, path)
+    def save(self, path, compress=0):
+        """
+        Save the trained model and its calibration to a file.
+        Args:
+            compress (int): joblib compression level, 0 for none
+        """
+        joblib.dump({"model": self.model, "calibration": self.calibration}, path, compress=compress)
 
     def load(self, path):
         """Load a trained model from a file"""
-        self.model = joblib.load(path) 
+        artifact = joblib.load(path)
+        # Older files contain just the pipeline
+        if isinstance(artifact, dict):
+            self.model = artifact["model"]
+            self.calibration = artifact.get("calibration")
+        else:
+            self.model = artifact
+            self.calibration = None
+
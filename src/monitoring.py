@@ -0,0 +1,183 @@
+from collections import deque
+import numpy as np
+import pandas as pd
+import joblib
+
+# Columns that identify issues rather than describe them; they drift by design
+ID_COLUMNS = ["key", "summary", "sprint_id", "board_id"]
+
+
+class SprintMonitor:
+    """
+    Watches a trained model as sprints close and tells us when it is getting stale.
+
+    For every closed sprint we compare the predictions made during planning with the
+    actual sprint_success. Everything is kept as small running aggregates (counts and
+    sums per bin, plus a fixed window of per-sprint results), so memory stays the same
+    no matter how many sprints we feed in.
+    """
+    def __init__(self, X_reference, features=None, categorical=("issue_type", "assignee"), n_bins=10,
+                 window=10, decay=0.8, baseline_accuracy=None):
+        """
+        Set up the monitor from the data the model was trained on.
+        Args:
+            X_reference (DataFrame): Training features, used as the reference for drift
+            features: Columns to watch for drift, e.g. model.model.feature_names_in_.
+                By default every numeric or categorical column except ID_COLUMNS.
+            categorical: Columns treated as categories instead of numbers
+            n_bins (int): Number of bins for numeric features and calibration
+            window (int): Number of recent sprints used for the rolling accuracy
+            decay (float): How much of the old drift counts to keep when a new sprint arrives
+            baseline_accuracy (float): Accuracy on the holdout set when the model was trained
+        """
+        # Ids and free text like key and summary are never watched
+        if features is None:
+            features = X_reference.columns
+        features = [c for c in features if c in X_reference.columns and c not in ID_COLUMNS]
+        self.categorical = [c for c in categorical if c in features]
+        numeric = X_reference[features].select_dtypes(include="number").columns
+        self.numerical = [c for c in numeric if c not in self.categorical]
+        self.n_bins = n_bins
+        self.decay = decay
+        self.baseline_accuracy = baseline_accuracy
+
+        # Reference distributions for drift: quantile bin edges for numbers, known values for categories
+        self.edges = {}
+        self.reference = {}
+        for col in self.numerical:
+            values = X_reference[col].astype(float).to_numpy()
+            edges = np.unique(np.quantile(values, np.linspace(0, 1, n_bins + 1))[1:-1])
+            self.edges[col] = edges
+            self.reference[col] = self._normalize(np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1))
+        self.categories = {}
+        for col in self.categorical:
+            counts = X_reference[col].astype(str).value_counts()
+            self.categories[col] = {value: i for i, value in enumerate(counts.index)}
+            # The last slot collects values that were never seen in training
+            self.reference[col] = self._normalize(np.append(counts.to_numpy(), 0))
+        self.current = {col: np.zeros_like(ref) for col, ref in self.reference.items()}
+
+        # Running prediction quality
+        self.n_issues = 0
+        self.n_correct = 0
+        self.brier_sum = 0.0
+        self.recent = deque(maxlen=window)  # (correct, total) for each recent sprint
+        self.calibration_count = np.zeros(n_bins)
+        self.calibration_prob_sum = np.zeros(n_bins)
+        self.calibration_outcome_sum = np.zeros(n_bins)
+        self.n_sprints = 0
+
+    @staticmethod
+    def _normalize(counts, eps=1e-4):
+        """Turn counts into proportions, with a small floor so PSI never divides by zero"""
+        counts = np.asarray(counts, dtype=float)
+        total = counts.sum()
+        proportions = counts / total if total > 0 else np.full(len(counts), 1.0 / len(counts))
+        return np.maximum(proportions, eps)
+
+    def _bin_counts(self, col, values):
+        """Count how many values fall into each reference bin"""
+        if col in self.edges:
+            idx = np.searchsorted(self.edges[col], values.astype(float).to_numpy(), side="right")
+        else:
+            unseen = len(self.categories[col])
+            idx = values.astype(str).map(self.categories[col]).fillna(unseen).astype(int).to_numpy()
+        return np.bincount(idx, minlength=len(self.reference[col]))
+
+    def update(self, X, y_true, proba, threshold=0.5):
+        """
+        Add the results of a closed sprint.
+        Args:
+            X (DataFrame): Features of the sprint's issues as they were at planning time
+            y_true: Actual sprint_success for each issue
+            proba: Predicted probability of completion stored when the sprint was planned
+            threshold (float): Decision threshold that was used for the predictions
+        """
+        y_true = np.asarray(y_true, dtype=float)
+        proba = np.asarray(proba, dtype=float)
+        if len(y_true) == 0:
+            return
+        correct = int(((proba >= threshold) == (y_true == 1)).sum())
+
+        self.n_sprints += 1
+        self.n_issues += len(y_true)
+        self.n_correct += correct
+        self.brier_sum += float(((proba - y_true) ** 2).sum())
+        self.recent.append((correct, len(y_true)))
+
+        bins = np.minimum((proba * self.n_bins).astype(int), self.n_bins - 1)
+        self.calibration_count += np.bincount(bins, minlength=self.n_bins)
+        self.calibration_prob_sum += np.bincount(bins, weights=proba, minlength=self.n_bins)
+        self.calibration_outcome_sum += np.bincount(bins, weights=y_true, minlength=self.n_bins)
+
+        # Fade out older sprints so drift reflects recent work
+        for col in self.current:
+            self.current[col] = self.current[col] * self.decay + self._bin_counts(col, X[col])
+
+    def accuracy(self):
+        """Accuracy over all sprints seen so far"""
+        return self.n_correct / self.n_issues if self.n_issues else None
+
+    def rolling_accuracy(self):
+        """Accuracy over the most recent sprints"""
+        total = sum(n for _, n in self.recent)
+        return sum(c for c, _ in self.recent) / total if total else None
+
+    def brier_score(self):
+        """Mean squared error of the predicted probabilities"""
+        return self.brier_sum / self.n_issues if self.n_issues else None
+
+    def calibration_table(self):
+        """Mean predicted probability against actual completion rate for each probability bin"""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return pd.DataFrame({
+                "bin_start": np.arange(self.n_bins) / self.n_bins,
+                "count": self.calibration_count.astype(int),
+                "mean_predicted": self.calibration_prob_sum / self.calibration_count,
+                "actual_rate": self.calibration_outcome_sum / self.calibration_count,
+            })
+
+    def psi(self):
+        """Population stability index of each feature against the training data"""
+        result = {}
+        for col, ref in self.reference.items():
+            if self.current[col].sum() == 0:
+                continue
+            cur = self._normalize(self.current[col])
+            result[col] = float(((cur - ref) * np.log(cur / ref)).sum())
+        return pd.Series(result, dtype=float)
+
+    def new_assignee_rate(self):
+        """Share of recent issues assigned to someone the model never saw in training"""
+        if "assignee" not in self.current or self.current["assignee"].sum() == 0:
+            return None
+        return float(self.current["assignee"][-1] / self.current["assignee"].sum())
+
+    def needs_retrain(self, accuracy_drop=0.1, psi_limit=0.25, new_assignee_limit=0.2, min_sprints=3):
+        """
+        Check whether retraining the model is worthwhile.
+        Returns:
+            A list of reasons; empty if the model still looks fine
+        """
+        reasons = []
+        if self.n_sprints < min_sprints:
+            return reasons
+        rolling = self.rolling_accuracy()
+        if self.baseline_accuracy is not None and rolling is not None and rolling < self.baseline_accuracy - accuracy_drop:
+            reasons.append(f"Rolling accuracy {rolling:.2f} is below the training accuracy {self.baseline_accuracy:.2f}")
+        for col, value in self.psi().items():
+            if value > psi_limit:
+                reasons.append(f"Feature '{col}' has drifted (PSI {value:.2f})")
+        rate = self.new_assignee_rate()
+        if rate is not None and rate > new_assignee_limit:
+            reasons.append(f"{rate:.0%} of recent issues have assignees the model has not seen")
+        return reasons
+
+    def save(self, path):
+        """Save the monitor state to a file"""
+        joblib.dump(self, path)
+
+    @staticmethod
+    def load(path):
+        """Load a monitor from a file"""
+        return joblib.load(path)
@@ -0,0 +1,214 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class WhatIfSession:
+    """
+    Keeps a planned sprint in memory so issues can be added, removed or
+    reassigned and the predictions refreshed without re-running the whole pipeline.
+
+    The session holds the sprint's features together with the encoded matrix the
+    classifier sees. An edit only re-encodes the issue that changed and patches the
+    sprint aggregate column (tasks_per_assignee) of its own sprint in place, then
+    re-scores the rows whose features actually moved.
+    """
+    def __init__(self, model, df):
+        """
+        Start a session for a planned sprint.
+        Args:
+            model (SprintSuccessModel): A trained model
+            df (DataFrame): The sprint's issues, as returned by process_issues_to_df or read from a predict CSV.
+                If it has a sprint_id column, the aggregates are kept per sprint.
+        """
+        self.model = model
+        pipeline = model.model
+
+        # Split the pipeline so we can encode rows once and score them many times
+        self._encoder = pipeline[:-1]
+        self._classifier = pipeline.steps[-1][1]
+        self.feature_columns = list(pipeline.feature_names_in_)
+
+        # Find where tasks_per_assignee ends up in the encoded matrix so it can be patched directly
+        encoded_names = list(self._encoder.get_feature_names_out())
+        self._tpa_index = None
+        for i, name in enumerate(encoded_names):
+            if name.split("__")[-1] == "tasks_per_assignee":
+                self._tpa_index = i
+                break
+        self._tpa_scale = self._encoder.named_steps["scaler"].scale_[self._tpa_index] if self._tpa_index is not None else None
+
+        # Keep our own copy of the sprint with clean missing values,
+        # but leave tasks_per_assignee as it came in so predictions match model.predict
+        self.df = self._fill_missing(df.drop(columns=["sprint_success"], errors="ignore")).reset_index(drop=True)
+
+        # Per-sprint task and assignee counts, kept up to date on every edit
+        self._sprints = {}
+        for sprint, assignee in zip(self._sprint_ids(self.df), self.df["assignee"]):
+            self._count(sprint, assignee, 1)
+
+        # Encode and score the whole sprint once
+        self._encoded = self._encode(self.df)
+        self._proba = self._score(self._encoded)
+
+    def _fill_missing(self, df):
+        """Fill in missing values the same way process_issues_to_df does"""
+        df = df.copy()
+        if "original_estimate" in df.columns:
+            df["original_estimate"] = df["original_estimate"].fillna(0)
+        if "assignee" in df.columns:
+            df["assignee"] = df["assignee"].fillna("Unassigned")
+        return df
+
+    def _sprint_ids(self, df):
+        """Sprint of each row; all rows are one sprint when there is no sprint_id column"""
+        if "sprint_id" in self.df.columns:
+            return df["sprint_id"].to_numpy()
+        return np.full(len(df), None)
+
+    def _count(self, sprint, assignee, delta):
+        """Keep a sprint's task count and per-assignee counts in sync"""
+        counts = self._sprints.setdefault(sprint, {"total": 0, "assignees": {}})
+        counts["total"] += delta
+        # process_issues_to_df counts assignees before filling in 'Unassigned', so those don't count
+        if assignee != "Unassigned":
+            count = counts["assignees"].get(assignee, 0) + delta
+            if count > 0:
+                counts["assignees"][assignee] = count
+            else:
+                counts["assignees"].pop(assignee, None)
+
+    def _tasks_per_assignee(self, sprint):
+        """How many tasks per person in a sprint right now, as process_issues_to_df computes it"""
+        counts = self._sprints.get(sprint, {"total": 0, "assignees": {}})
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.float64(counts["total"]) / len(counts["assignees"])
+
+    def _encode(self, df):
+        """
+        Run rows through the preprocessing steps of the trained pipeline.
+        Sparse output stays sparse (as LIL, so rows can be patched): some classifiers,
+        like XGBoost, read a missing sparse entry differently from a stored zero.
+        """
+        encoded = self._encoder.transform(df[self.feature_columns])
+        if sparse.issparse(encoded):
+            return encoded.tolil()
+        return np.asarray(encoded, dtype=float)
+
+    def _score(self, encoded):
+        """Score encoded rows, applying the model's calibration if it has one"""
+        if sparse.issparse(encoded):
+            encoded = encoded.tocsr()
+        return self.model.apply_calibration(self._classifier.predict_proba(encoded))
+
+    def _position(self, key):
+        """Find the row of an issue by its key"""
+        matches = np.flatnonzero(self.df["key"].to_numpy() == key)
+        if len(matches) == 0:
+            raise KeyError(f"Issue {key} is not in the sprint")
+        return int(matches[0])
+
+    def _apply_edit(self, sprint, before, changed_rows):
+        """
+        Move the sprint's tasks_per_assignee by how much the edit changed it and
+        re-score the affected rows. Only rows of the edited sprint are touched.
+        """
+        after = self._tasks_per_assignee(sprint)
+        rows = list(changed_rows)
+        if not np.isclose(before, after) and len(self.df):
+            in_sprint = np.flatnonzero(self._sprint_ids(self.df) == sprint) if sprint is not None else np.arange(len(self.df))
+            values = self.df["tasks_per_assignee"].to_numpy(dtype=float)[in_sprint]
+            # Add the change to each row's own value; start over if either side is not a number
+            values = values + (after - before) if np.isfinite(before) and np.isfinite(after) else np.full(len(in_sprint), after)
+            self.df.loc[in_sprint, "tasks_per_assignee"] = values
+            if self._tpa_index is not None and sparse.issparse(self._encoded):
+                for row, value in zip(in_sprint, values / self._tpa_scale):
+                    self._encoded[row, self._tpa_index] = value
+            elif self._tpa_index is not None:
+                self._encoded[in_sprint, self._tpa_index] = values / self._tpa_scale
+            rows = sorted(set(rows) | set(in_sprint.tolist()))
+        if len(rows):
+            self._proba[rows] = self._score(self._encoded[rows])
+        return np.asarray(rows, dtype=int)
+
+    def add_issue(self, issue):
+        """
+        Add an issue to the sprint.
+        Args:
+            issue (dict): Issue features, including 'key' and the model's feature columns
+                (and 'sprint_id' when the session has more than one sprint)
+        Returns:
+            Positions of the rows that were re-scored
+        """
+        row = self._fill_missing(pd.DataFrame([issue]))
+        if "sprint_id" in self.df.columns and "sprint_id" not in row.columns:
+            if len(self._sprints) != 1:
+                raise ValueError("Issue must have a 'sprint_id' when the session has several sprints")
+            row["sprint_id"] = next(iter(self._sprints))
+        missing = [col for col in self.feature_columns + ["key"] if col not in row.columns and col != "tasks_per_assignee"]
+        if missing:
+            raise ValueError(f"Issue is missing required columns: {', '.join(missing)}")
+        if issue["key"] in set(self.df["key"]):
+            raise ValueError(f"Issue {issue['key']} is already in the sprint")
+
+        # The new issue starts at the sprint's current value and moves with the rest of it
+        sprint = self._sprint_ids(row)[0]
+        before = self._tasks_per_assignee(sprint)
+        row["tasks_per_assignee"] = before if np.isfinite(before) else self._tasks_per_assignee_after_add(sprint, row)
+        self.df = pd.concat([self.df, row[self.df.columns.intersection(row.columns)]], ignore_index=True)
+        self._count(sprint, row["assignee"].iat[0], 1)
+
+        encoded_row = self._encode(row)
+        if sparse.issparse(self._encoded):
+            self._encoded = sparse.vstack([self._encoded, encoded_row], format="lil")
+        else:
+            self._encoded = np.vstack([self._encoded, encoded_row])
+        self._proba = np.vstack([self._proba, np.zeros((1, self._proba.shape[1]))])
+        return self._apply_edit(sprint, before, [len(self.df) - 1])
+
+    def _tasks_per_assignee_after_add(self, sprint, row):
+        """tasks_per_assignee of a sprint once the row is in it"""
+        self._count(sprint, row["assignee"].iat[0], 1)
+        value = self._tasks_per_assignee(sprint)
+        self._count(sprint, row["assignee"].iat[0], -1)
+        return value
+
+    def remove_issue(self, key):
+        """
+        Remove an issue from the sprint.
+        Returns:
+            Positions of the rows that were re-scored
+        """
+        pos = self._position(key)
+        sprint = self._sprint_ids(self.df)[pos]
+        before = self._tasks_per_assignee(sprint)
+        self._count(sprint, self.df["assignee"].iat[pos], -1)
+        self.df = self.df.drop(index=pos).reset_index(drop=True)
+        keep = np.delete(np.arange(self._encoded.shape[0]), pos)
+        self._encoded = self._encoded[keep]
+        self._proba = np.delete(self._proba, pos, axis=0)
+        return self._apply_edit(sprint, before, [])
+
+    def reassign_issue(self, key, assignee):
+        """
+        Give an issue to someone else.
+        Returns:
+            Positions of the rows that were re-scored
+        """
+        pos = self._position(key)
+        sprint = self._sprint_ids(self.df)[pos]
+        assignee = assignee if assignee is not None else "Unassigned"
+        before = self._tasks_per_assignee(sprint)
+        self._count(sprint, self.df["assignee"].iat[pos], -1)
+        self._count(sprint, assignee, 1)
+        self.df.loc[pos, "assignee"] = assignee
+        self._encoded[pos] = self._encode(self.df.iloc[[pos]])[0]
+        return self._apply_edit(sprint, before, [pos])
+
+    def predict(self):
+        """Predicted outcome for each issue currently in the sprint"""
+        return self.model.proba_to_labels(self._proba)
+
+    def predict_proba(self):
+        """Probability estimates for each issue currently in the sprint"""
+        return self._proba.copy()
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+from src.data_processing import build_changelog_features, CHANGELOG_COLUMNS
+
+def event(history_id, changed, field, to_string=None, from_value=None, to_value=None, key="A-1"):
+    return {
+        "key": key, "history_id": str(history_id), "changed": changed, "field": field,
+        "from": from_value, "to": to_value, "from_string": None, "to_string": to_string
+    }
+
+def sprint(sprint_id, start=None, end=None, key="A-1"):
+    return {"key": key, "sprint_id": sprint_id, "sprint_start": start, "sprint_end": end}
+
+HISTORY = [
+    event(1, "2024-01-02T00:00:00Z", "status", to_string="In Progress"),
+    event(2, "2024-01-04T00:00:00Z", "status", to_string="In Review"),
+    event(3, "2024-01-04T00:00:00Z", "assignee"),
+    event(4, "2024-01-05T00:00:00Z", "timeoriginalestimate"),
+    event(5, "2024-01-06T00:00:00Z", "Sprint", from_value="", to_value="10"),
+    event(6, "2024-01-20T00:00:00Z", "Sprint", from_value="10", to_value="10, 11"),
+    event(7, "2024-01-21T00:00:00Z", "status", to_string="Done"),
+    event(8, "2024-01-21T00:00:00Z", "assignee"),
+]
+
+def features_for(history, sprints):
+    features = build_changelog_features(history, pd.DataFrame(sprints))
+    return features.set_index("sprint_id")
+
+def test_history_is_cut_off_at_sprint_start():
+    features = features_for(HISTORY, [sprint(11, "2024-01-15T00:00:00Z", "2024-01-29T00:00:00Z")])
+    row = features.loc[11]
+    # Events after the sprint started (the move to Done, the second reassignment) are ignored
+    assert row["status_change_count"] == 2
+    assert row["reassignment_count"] == 1
+    assert row["estimate_change_count"] == 1
+
+def test_time_in_progress():
+    features = features_for(HISTORY, [sprint(11, "2024-01-15T00:00:00Z", "2024-01-29T00:00:00Z")])
+    # In Progress from Jan 2 to Jan 4, then In Review until the sprint started on Jan 15
+    assert features.loc[11, "days_in_progress"] == pytest.approx(2 + 11)
+
+def test_carry_over_excludes_current_sprint():
+    features = features_for(HISTORY, [
+        sprint(10, "2024-01-08T00:00:00Z", "2024-01-14T00:00:00Z"),
+        sprint(11, "2024-01-21T12:00:00Z", "2024-01-29T00:00:00Z"),
+    ])
+    assert features.loc[10, "carry_over_count"] == 0
+    assert features.loc[11, "carry_over_count"] == 1
+
+def test_no_events_before_cutoff():
+    features = features_for(HISTORY, [sprint(9, "2024-01-01T00:00:00Z", "2024-01-07T00:00:00Z")])
+    assert (features.loc[9, CHANGELOG_COLUMNS] == 0).all()
+
+def test_finished_sprint_without_start_gets_no_history():
+    features = features_for(HISTORY, [sprint(11, None, "2024-01-29T00:00:00Z")])
+    assert (features.loc[11, CHANGELOG_COLUMNS] == 0).all()
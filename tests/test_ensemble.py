@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+from src import ensemble
+from src.ensemble import TeamEnsembleModel
+from src.model import SprintSuccessModel
+
+FEATURES = [
+    "issue_type", "assignee", "original_estimate", "was_in_previous_sprint",
+    "days_in_sprint", "comment_count", "tasks_per_assignee"
+]
+
+def team_data():
+    """Three big teams, one small team and one big team that (almost) always finishes"""
+    df = pd.read_csv("data/mock_data.csv")
+    df["board_id"] = np.arange(len(df)) % 3
+    df.loc[df.index[:20], "board_id"] = 7
+    one_sided = pd.concat([df[df["sprint_success"] == 1].iloc[:59], df[df["sprint_success"] == 0].iloc[:1]])
+    df = pd.concat([df, one_sided.assign(board_id=8)], ignore_index=True)
+    df["sprint_id"] = np.arange(len(df)) // 20
+    return df[FEATURES + ["board_id", "sprint_id"]], df["sprint_success"]
+
+def trained_ensemble(**kwargs):
+    X, y = team_data()
+    model = TeamEnsembleModel(min_team_size=50, n_jobs=2, **kwargs)
+    model.train(X, y)
+    return model, X, y
+
+def test_small_and_one_sided_teams_fall_back_to_global_model():
+    model, X, y = trained_ensemble(calibrate=True)
+    assert sorted(model.team_models) == ["0", "1", "2", "8"]
+    assert model._model_for("7") is model.global_model
+    # Team 8 has a single unfinished issue, too few to calibrate
+    assert model.team_models["8"].calibration is None
+    assert "sprint_id" not in model.global_model.model.feature_names_in_
+
+def test_routing_keeps_the_original_order():
+    model, X, y = trained_ensemble()
+    shuffled = X.sample(frac=1, random_state=0)
+    proba = model.predict_proba(shuffled)
+    for team in ["0", "7"]:
+        rows = (shuffled["board_id"].astype(str) == team).to_numpy()
+        team_model = model._model_for(team)
+        assert np.allclose(proba[rows], team_model.predict_proba(shuffled[rows][FEATURES]))
+        assert (model.predict(shuffled)[rows] == team_model.predict(shuffled[rows][FEATURES])).all()
+
+def test_save_load_round_trip_with_lazy_loading(tmp_path):
+    model, X, y = trained_ensemble()
+    expected = model.predict_proba(X)
+    model.save(tmp_path)
+
+    loaded = TeamEnsembleModel(max_loaded_models=2)
+    loaded.load(tmp_path)
+    assert len(loaded._loaded) == 0
+    assert np.allclose(loaded.predict_proba(X), expected)
+    # Only the two most recently used team models stay in memory
+    assert len(loaded._loaded) == 2
+
+def test_empty_batch_shapes():
+    model, X, y = trained_ensemble()
+    empty = X.iloc[:0]
+    assert model.predict(empty).shape == (0,)
+    assert model.predict(empty).dtype == model.global_model.model.classes_.dtype
+    assert model.predict_proba(empty).shape == (0, 2)
+
+def test_team_calibration_uses_sprint_groups(monkeypatch):
+    X, y = team_data()
+    seen = {}
+    def fake_calibrate(self, X, y, groups=None, **kwargs):
+        seen["groups"] = groups
+    monkeypatch.setattr(SprintSuccessModel, "calibrate", fake_calibrate)
+    groups = X["sprint_id"].to_numpy()
+    ensemble._train_team_model("random_forest", False, True, X[FEATURES], y, groups)
+    assert seen["groups"] is groups
@@ -0,0 +1,49 @@
+from src.jira_client import JiraClient
+
+def make_client(responses):
+    client = JiraClient(domain="example.atlassian.net", email="me@example.com", api_token="token")
+    client.min_request_interval = 0
+    calls = []
+    def fake_request(method, url, **kwargs):
+        calls.append((url, kwargs.get("params", {})))
+        return responses(url, kwargs.get("params", {}))
+    client._make_request = fake_request
+    return client, calls
+
+def issue(key, histories, total):
+    return {"key": key, "fields": {"updated": "2024-01-01"}, "changelog": {"total": total, "histories": histories}}
+
+def history(i):
+    return {"id": str(i), "created": "2024-01-01T00:00:00Z", "items": [{"field": "status", "toString": "In Progress"}]}
+
+def test_changelog_endpoint_is_paged_only_when_truncated():
+    def responses(url, params):
+        if url.endswith("/issue"):
+            return {"issues": [
+                issue("A-1", [history(1)], total=1),
+                issue("A-2", [history(1)], total=3),
+            ]}
+        # Per-issue changelog, served two histories per page
+        start = params["startAt"]
+        values = [history(i) for i in range(start, min(start + 2, 3))]
+        return {"values": values, "isLast": start + 2 >= 3}
+
+    client, calls = make_client(responses)
+    issues = client.get_issues_for_sprint(7, expand_changelog=True)
+
+    assert calls[0][1]["expand"] == "changelog"
+    changelog_calls = [url for url, _ in calls if url.endswith("/changelog")]
+    assert changelog_calls == [
+        "https://example.atlassian.net/rest/api/3/issue/A-2/changelog",
+        "https://example.atlassian.net/rest/api/3/issue/A-2/changelog",
+    ]
+    assert len(issues[0]["changelog"]["histories"]) == 1
+    assert len(issues[1]["changelog"]["histories"]) == 3
+
+def test_parsed_changelog_is_cached_across_clients():
+    cache = {}
+    first = JiraClient(domain="example.atlassian.net", email="me@example.com", api_token="token", changelog_cache=cache)
+    rows = first.parse_changelog(issue("A-1", [history(1)], total=1))
+    assert rows[0]["field"] == "status"
+    second = JiraClient(domain="example.atlassian.net", email="me@example.com", api_token="token", changelog_cache=cache)
+    assert second.parse_changelog(issue("A-1", [], total=0)) is rows
@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+from src.model import SprintSuccessModel
+
+FEATURES = [
+    "issue_type", "assignee", "original_estimate", "was_in_previous_sprint",
+    "days_in_sprint", "comment_count", "tasks_per_assignee"
+]
+
+def test_calibrate_with_a_single_sprint():
+    df = pd.read_csv("data/mock_data.csv")
+    model = SprintSuccessModel()
+    model.train(df[FEATURES], df["sprint_success"])
+    calibration = model.calibrate(df[FEATURES], df["sprint_success"], groups=np.zeros(len(df)))
+    assert calibration is not None
+    assert len(model.predict(df[FEATURES])) == len(df)
+
+def test_calibrate_skips_when_an_outcome_is_too_rare():
+    df = pd.read_csv("data/mock_data.csv")
+    df = pd.concat([df[df["sprint_success"] == 1].iloc[:59], df[df["sprint_success"] == 0].iloc[:1]])
+    for model_type in ["random_forest", "xgboost"]:
+        model = SprintSuccessModel(model_type)
+        model.train(df[FEATURES], df["sprint_success"])
+        assert model.calibrate(df[FEATURES], df["sprint_success"]) is None
+        assert model.calibration is None
+
+def test_is_trained():
+    df = pd.read_csv("data/mock_data.csv")
+    model = SprintSuccessModel()
+    assert not model.is_trained()
+    model.train(df[FEATURES], df["sprint_success"])
+    assert model.is_trained()
+
+def test_summary_cache_is_keyed_by_digest():
+    from src import model as model_module
+    from src.model import SummaryVectorizer
+    model_module._SUMMARY_CACHE.clear()
+    summary = "Implement dark mode toggle " * 20
+    X = pd.DataFrame({"key": ["A-1", "A-2"], "summary": [summary, "Fix login bug"]})
+    vectorizer = SummaryVectorizer(n_features=64)
+    first = vectorizer.transform(X)
+    assert all(summary not in key for key in model_module._SUMMARY_CACHE)
+    assert all(len(key[2]) == 16 for key in model_module._SUMMARY_CACHE)
+    assert (vectorizer.transform(X) != first).nnz == 0
+    assert (first != vectorizer._vectorizer().transform(X["summary"])).nnz == 0
+    vectorizer.transform(X.assign(summary=["Changed", "Fix login bug"]))
+    assert len(model_module._SUMMARY_CACHE) == 3
+
+def calibrated_model(method="isotonic"):
+    df = pd.read_csv("data/mock_data.csv")
+    model = SprintSuccessModel()
+    model.train(df[FEATURES], df["sprint_success"])
+    model.calibrate(df[FEATURES], df["sprint_success"], groups=np.arange(len(df)) // 20, method=method)
+    return model, df
+
+def test_predict_uses_tuned_threshold():
+    model, df = calibrated_model()
+    model.calibration["threshold"] = 0.9
+    proba = model.predict_proba(df[FEATURES])
+    predictions = model.predict(df[FEATURES])
+    assert (predictions == (proba[:, 1] >= 0.9).astype(int)).all()
+    assert (predictions != np.argmax(proba, axis=1)).any()
+
+def test_save_and_load_keep_calibration(tmp_path):
+    model, df = calibrated_model()
+    path = tmp_path / "model.joblib"
+    model.save(path)
+    loaded = SprintSuccessModel()
+    loaded.load(path)
+    assert loaded.calibration["threshold"] == model.calibration["threshold"]
+    assert np.allclose(loaded.predict_proba(df[FEATURES]), model.predict_proba(df[FEATURES]))
+
+def test_load_pipeline_only_file(tmp_path):
+    import joblib
+    df = pd.read_csv("data/mock_data.csv")
+    model = SprintSuccessModel()
+    model.train(df[FEATURES], df["sprint_success"])
+    path = tmp_path / "legacy.joblib"
+    joblib.dump(model.model, path)
+    loaded = SprintSuccessModel()
+    loaded.load(path)
+    assert loaded.calibration is None
+    assert (loaded.predict(df[FEATURES]) == model.predict(df[FEATURES])).all()
+
+def test_platt_calibration_is_monotonic():
+    model, df = calibrated_model(method="platt")
+    raw = np.linspace(0, 1, 101)
+    calibrated = model.apply_calibration(np.column_stack([1 - raw, raw]))[:, 1]
+    assert (np.diff(calibrated) >= 0).all()
+    assert calibrated[-1] > calibrated[0]
@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+import pytest
+from src.monitoring import SprintMonitor
+
+def test_text_columns_are_ignored():
+    df = pd.read_csv("data/mock_data.csv")
+    X = df.drop(columns=["sprint_success"])
+    monitor = SprintMonitor(X)
+    monitor.update(X.iloc[:50], df["sprint_success"].iloc[:50], [0.6] * 50)
+    assert "key" not in monitor.psi().index
+    assert "summary" not in monitor.psi().index
+    assert monitor.accuracy() is not None
+
+def reference(n=200):
+    return pd.DataFrame({
+        "days_in_sprint": np.arange(n) % 100,
+        "issue_type": np.where(np.arange(n) % 2, "Task", "Bug"),
+        "assignee": np.where(np.arange(n) % 4 < 2, "a", "b"),
+        "sprint_id": np.arange(n) // 20,
+    })
+
+def test_id_columns_are_not_watched():
+    X = reference()
+    monitor = SprintMonitor(X)
+    later = X.assign(sprint_id=X["sprint_id"] + 100)
+    for _ in range(3):
+        monitor.update(later, np.ones(len(X)), np.full(len(X), 0.9))
+    assert "sprint_id" not in monitor.psi().index
+    assert monitor.needs_retrain() == []
+
+def test_rolling_accuracy_forgets_old_sprints():
+    X = reference(4)
+    monitor = SprintMonitor(X, window=2)
+    monitor.update(X, [1, 1, 0, 0], [0.9, 0.9, 0.1, 0.1])  # all correct
+    monitor.update(X, [1, 1, 0, 0], [0.1, 0.1, 0.9, 0.9])  # all wrong
+    monitor.update(X, [1, 1, 0, 0], [0.1, 0.1, 0.9, 0.9])  # all wrong
+    assert monitor.rolling_accuracy() == 0
+    assert monitor.accuracy() == pytest.approx(1 / 3)
+
+def test_brier_score_and_calibration_bins():
+    X = reference(4)
+    monitor = SprintMonitor(X)
+    monitor.update(X, [0, 1, 1, 1], [0.2, 0.8, 0.85, 0.25])
+    assert monitor.brier_score() == pytest.approx((0.04 + 0.04 + 0.0225 + 0.5625) / 4)
+    table = monitor.calibration_table().set_index("bin_start")
+    assert table.loc[0.2, "count"] == 2
+    assert table.loc[0.2, "mean_predicted"] == pytest.approx(0.225)
+    assert table.loc[0.2, "actual_rate"] == pytest.approx(0.5)
+    assert table.loc[0.8, "count"] == 2
+    assert table.loc[0.8, "actual_rate"] == pytest.approx(1.0)
+    assert table["count"].sum() == 4
+
+def test_psi_small_for_same_data_and_large_for_shifted_data():
+    X = reference()
+    same = SprintMonitor(X)
+    same.update(X, np.ones(len(X)), np.full(len(X), 0.9))
+    assert (same.psi() < 0.01).all()
+
+    shifted = SprintMonitor(X)
+    shifted.update(X.assign(days_in_sprint=X["days_in_sprint"] + 500), np.ones(len(X)), np.full(len(X), 0.9))
+    assert shifted.psi()["days_in_sprint"] > 0.25
+
+def test_new_assignee_rate():
+    X = reference(8)
+    monitor = SprintMonitor(X, decay=0.5)
+    assert monitor.new_assignee_rate() is None
+    monitor.update(X, np.ones(8), np.full(8, 0.9))
+    assert monitor.new_assignee_rate() == 0
+    monitor.update(X.assign(assignee="someone new"), np.ones(8), np.full(8, 0.9))
+    # Older sprint counts are halved: 4 known against 8 new
+    assert monitor.new_assignee_rate() == pytest.approx(8 / 12)
+
+def test_needs_retrain_waits_for_min_sprints():
+    X = reference()
+    monitor = SprintMonitor(X, baseline_accuracy=0.9)
+    shifted = X.assign(days_in_sprint=X["days_in_sprint"] + 500)
+    for _ in range(2):
+        monitor.update(shifted, np.ones(len(X)), np.full(len(X), 0.1))
+    assert monitor.needs_retrain(min_sprints=3) == []
+    monitor.update(shifted, np.ones(len(X)), np.full(len(X), 0.1))
+    reasons = monitor.needs_retrain(min_sprints=3)
+    assert any("accuracy" in reason for reason in reasons)
+    assert any("days_in_sprint" in reason for reason in reasons)
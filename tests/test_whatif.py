@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from src.model import SprintSuccessModel
+from src.whatif import WhatIfSession
+
+FEATURES = [
+    "issue_type", "assignee", "original_estimate", "was_in_previous_sprint",
+    "days_in_sprint", "comment_count", "tasks_per_assignee"
+]
+
+def trained_model():
+    df = pd.read_csv("data/mock_data.csv")
+    model = SprintSuccessModel()
+    model.train(df[FEATURES], df["sprint_success"])
+    return model, df
+
+def test_new_session_matches_model_predict():
+    model, df = trained_model()
+    session = WhatIfSession(model, df)
+    assert (session.predict() == model.predict(df)).all()
+
+def test_edit_only_moves_its_own_sprint():
+    model, df = trained_model()
+    sprint = df.iloc[:40].copy()
+    sprint["sprint_id"] = np.arange(40) // 20
+    session = WhatIfSession(model, sprint)
+    before = session.df["tasks_per_assignee"].copy()
+    session.remove_issue(sprint["key"].iloc[25])
+    assert (session.df["tasks_per_assignee"].iloc[:20] == before.iloc[:20]).all()
+    assert np.allclose(session.predict_proba(), model.predict_proba(session.df[FEATURES]))
+
+def test_text_features_stay_sparse_for_xgboost():
+    df = pd.read_csv("data/mock_data.csv")
+    columns = FEATURES + ["key", "summary"]
+    model = SprintSuccessModel("xgboost", use_text=True)
+    model.train(df[columns], df["sprint_success"])
+    session = WhatIfSession(model, df.iloc[:40])
+    session.reassign_issue(df["key"].iloc[2], df["assignee"].iloc[0])
+    assert np.allclose(session.predict_proba(), model.predict_proba(session.df[columns]))